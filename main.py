@@ -1,11 +1,17 @@
 import requests
-from bs4 import BeautifulSoup
+import requests_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import codecs
 import json
+import orjson
+import os
 import time
 import random
 import re
 from urllib.parse import urljoin
-import schedule
+from html import unescape
+from concurrent.futures import ThreadPoolExecutor
 import logging
 
 
@@ -20,6 +26,74 @@ logging.basicConfig(
 logger = logging.getLogger("shop_parser")
 
 
+try:
+    from selectolax.lexbor import LexborHTMLParser
+
+    def parseHtml(html):
+        return LexborHTMLParser(html)
+
+    def selectOne(node, selector):
+        return node.css_first(selector)
+
+    def selectAll(node, selector):
+        return node.css(selector)
+
+    def getText(node):
+        return node.text(separator=" ", strip=True)
+
+    def getAttribute(node, name):
+        return node.attributes.get(name)
+
+    def findParent(node, className):
+        node = node.parent
+        while node is not None and className not in (node.attributes.get("class") or "").split():
+            node = node.parent
+        return node
+
+    def getNodeKey(node):
+        return node.mem_id
+
+    def findScript(tree, pattern):
+        for script in tree.css("script"):
+            text = script.text()
+            if pattern.search(text):
+                return text
+        return None
+
+except ImportError:
+    from functools import lru_cache
+    from bs4 import BeautifulSoup
+    import soupsieve
+
+    compileSelector = lru_cache(maxsize=None)(soupsieve.compile)
+
+    def parseHtml(html):
+        # makeRequest отдаёт байты только для страниц в UTF-8
+        return BeautifulSoup(html, "lxml", from_encoding="utf-8" if isinstance(html, bytes) else None)
+
+    def selectOne(node, selector):
+        return compileSelector(selector).select_one(node)
+
+    def selectAll(node, selector):
+        return compileSelector(selector).select(node)
+
+    def getText(node):
+        return node.get_text(separator=" ", strip=True)
+
+    def getAttribute(node, name):
+        return node.get(name)
+
+    def findParent(node, className):
+        return node.find_parent(class_=className)
+
+    def getNodeKey(node):
+        return id(node)
+
+    def findScript(tree, pattern):
+        script = tree.find("script", string=lambda text: text and pattern.search(text))
+        return script.string if script else None
+
+
 BASE_URL = "https://www.zveromir.ru/"
 CATEGORIES = [
     "https://www.zveromir.ru/shop/perenoski_dlya_sobak/",
@@ -29,17 +103,90 @@ CATEGORIES = [
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/135.0.0.0 Safari/537.36",
 }
+
 EXECUTION_INTERVAL_DAYS = 3
+REQUEST_TIMEOUT = (5, 20)
+MAX_ATTEMPTS = 3
+RETRY_BACKOFF_BASE = 1
+MAX_RETRY_AFTER = 60
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_WORKERS = 8
+CACHE_NAME = "zveromir_cache"
+CHECKPOINT_FILE = "checkpoint.json"
+
+ITEMS_RE = re.compile(r"var\s+items_v\s*=\s*")
+ITEMS_DECODER = json.JSONDecoder()
+
+TITLE_RE = re.compile(rb"<h1[^>]*>(.*?)</h1>", re.DOTALL | re.IGNORECASE)
+PAGER_MARKER = b'class="yiiPager"'
+PAGER_RE = re.compile(rb'class="(?:[^"]*\s)?page(?:\s[^"]*)?"[^>]*>\s*(?:<a\b[^>]*>\s*)?(\d+)')
+TAG_RE = re.compile(r"<[^>]+>")
+CATEGORY_SLUG_RE = re.compile(r"/shop/([^/]+)/?$")
+
+TITLE_SELECTOR = "h1"
+GOODS_CLASS = "goods"
+GOODS_IMAGE_SELECTOR = ".goodsBlock .goods img"
+LINK_SELECTOR = "a"
+DESCRIPTION_SELECTOR = "[itemprop=description]"
+MAIN_IMAGE_SELECTOR = ".eslider-main-img"
+CATALOG_NAME_SELECTOR = ".name"
+CATALOG_TITLED_LINK_SELECTOR = "a[title]"
+CATALOG_IMAGE_ALT_SELECTOR = "img[alt]"
+
+SESSION = requests_cache.CachedSession(
+    CACHE_NAME,
+    backend="sqlite",
+    expire_after=EXECUTION_INTERVAL_DAYS * 86400,
+    cache_control=True,
+)
+SESSION.headers.update(HEADERS)
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.5),
+))
+
+
+def getRetryDelay(response, attempt):
+    """
+    Вычисляет паузу перед повторным запросом: Retry-After для 429, иначе экспоненциальная задержка со случайным разбросом.
+    """
+    retryAfter = response.headers.get("Retry-After", "")
+    if response.status_code == 429 and retryAfter.isdigit():
+        return min(int(retryAfter), MAX_RETRY_AFTER)
+
+    return RETRY_BACKOFF_BASE * 2 ** attempt + random.uniform(0, RETRY_BACKOFF_BASE)
+
+
+def isUtf8(encoding):
+    """
+    Проверяет, что кодировка ответа - UTF-8.
+    """
+    try:
+        return bool(encoding) and codecs.lookup(encoding).name == "utf-8"
+    except LookupError:
+        return False
 
 
 def makeRequest(url):
     """
-    Выполняет запрос к указанному URL и возвращает HTML страницы.
+    Выполняет запрос к указанному URL и возвращает HTML страницы: байты, если страница в UTF-8,
+    иначе строку, декодированную по кодировке из ответа сервера.
     """
     try:
         # time.sleep(random.uniform(1, 3))
-        response = requests.get(url, headers=HEADERS)
+        for attempt in range(MAX_ATTEMPTS):
+            response = SESSION.get(url, timeout=REQUEST_TIMEOUT)
+            if response.status_code not in RETRY_STATUSES or attempt == MAX_ATTEMPTS - 1:
+                break
+
+            delay = getRetryDelay(response, attempt)
+            logger.warning(f"Сервер вернул {response.status_code} для {url}, повтор через {delay:.1f} с")
+            time.sleep(delay)
+
         response.raise_for_status()
+        if isUtf8(response.encoding):
+            return response.content
         return response.text
     except requests.exceptions.RequestException as e:
         logger.error(f"Ошибка при запросе к {url}: {e}")
@@ -50,53 +197,53 @@ def analyzeCategoryPage(url):
     """
     Анализирует страницу категории для получения названия категории и количества страниц.
     """
+    slugMatch = CATEGORY_SLUG_RE.search(url)
+    fallbackName = (slugMatch.group(1) if slugMatch else url).replace("_", " ").title()
+
     try:
         html = makeRequest(url)
         if not html:
-            return url.split("/")[-2].replace("_", " ").title(), 1
+            return fallbackName, 1
 
-        soup = BeautifulSoup(html, "html.parser")
+        if isinstance(html, str):
+            html = html.encode("utf-8")
 
-        categoryNameElement = soup.select_one("h1")
-        categoryName = categoryNameElement.get_text(separator=" ", strip=True) if categoryNameElement else url.split("/")[-2].replace("_", " ").title()
+        categoryNameMatch = TITLE_RE.search(html)
+        categoryName = None
+        if categoryNameMatch:
+            categoryNameHtml = categoryNameMatch.group(1).decode("utf-8", errors="replace")
+            categoryName = " ".join(unescape(TAG_RE.sub(" ", categoryNameHtml)).split())
+        if not categoryName:
+            categoryName = fallbackName
 
-        pagination = soup.select(".yiiPager .page")
         pagesCount = 1
-
-        if pagination:
-            pages = []
-            for page in pagination:
-                try:
-                    pageNum = int(page.get_text(separator=" ", strip=True))
-                    pages.append(pageNum)
-                except ValueError:
-                    continue
-            pagesCount = max(pages) if pages else 1
+        pagerStart = html.find(PAGER_MARKER)
+        if pagerStart >= 0:
+            pagerEnd = html.find(b"</ul>", pagerStart)
+            pagerHtml = html[pagerStart:pagerEnd] if pagerEnd >= 0 else html[pagerStart:]
+            pagesCount = max(map(int, PAGER_RE.findall(pagerHtml)), default=1)
 
         logger.info(f"Категория: {categoryName}, страниц: {pagesCount}")
         return categoryName, pagesCount
 
     except Exception as e:
         logger.error(f"Ошибка при анализе страницы категории {url}: {e}")
-        return url.split("/")[-2].replace("_", " ").title(), 1
+        return fallbackName, 1
 
 
-def extractItemsData(html):
+def extractItemsData(scriptText):
     """
-    Извлекает данные о товарах из JavaScript переменной в тегах script.
+    Извлекает данные о товарах из JavaScript переменной в теге script.
     """
-    if not html:
+    if not scriptText:
         return {}
 
     try:
-        itemsDataPattern = re.compile(r"var\s+items_v\s*=\s*(\{.*?\});", re.DOTALL)
-        match = itemsDataPattern.search(html)
+        match = ITEMS_RE.search(scriptText)
 
         if match:
-            itemsJsonStr = match.group(1)
-
             try:
-                itemsData = json.loads(itemsJsonStr)
+                itemsData, _ = ITEMS_DECODER.raw_decode(scriptText, match.end())
                 return itemsData
             except json.JSONDecodeError as e:
                 logger.error(f"Ошибка при парсинге JSON данных из script тега: {e}")
@@ -106,17 +253,6 @@ def extractItemsData(html):
     return {}
 
 
-def extractProductId(productElement):
-    """
-    Извлекает ID товара из HTML-элемента.
-    """
-    itemIdElement = productElement.select_one("img")
-    if itemIdElement and itemIdElement.get("id"):
-        return itemIdElement.get("id")[1:]
-
-    return None
-
-
 def extractProductVariants(itemsData, productId):
     """
     Извлекает варианты товара из данных JavaScript.
@@ -134,11 +270,41 @@ def extractProductVariants(itemsData, productId):
     return variants
 
 
+def extractCatalogDetails(productElement):
+    """
+    Извлекает из карточки каталога название, описание и картинку товара, если карточка задаёт
+    описание и картинку явно в data-атрибутах. Иначе возвращает пустой словарь.
+    """
+    description = getAttribute(productElement, "data-description")
+    image = getAttribute(productElement, "data-image")
+    if not description or not image:
+        return {}
+
+    name = getAttribute(productElement, "data-name")
+    if not name:
+        nameElement = selectOne(productElement, CATALOG_NAME_SELECTOR)
+        name = getText(nameElement) if nameElement else None
+    if not name:
+        titledLink = selectOne(productElement, CATALOG_TITLED_LINK_SELECTOR)
+        name = getAttribute(titledLink, "title") if titledLink else None
+    if not name:
+        imageWithAlt = selectOne(productElement, CATALOG_IMAGE_ALT_SELECTOR)
+        name = getAttribute(imageWithAlt, "alt") if imageWithAlt else None
+
+    return {
+        "name": name.strip() or None if name else None,
+        "description": description.replace("\xa0", " "),
+        "image": urljoin(BASE_URL, image.strip())
+    }
+
+
 def getProductsInfoFromCatalog(categoryUrl, page=1):
     """
     Получает информацию о товарах из страницы каталога.
     """
-    productsInfo = {}
+    productsInfo = []
+    seenProductIds = set()
+    seenProductElements = set()
 
     if page > 1:
         pageUrl = f"{categoryUrl}page/{page}/"
@@ -152,36 +318,37 @@ def getProductsInfoFromCatalog(categoryUrl, page=1):
         return []
 
     try:
-        soup = BeautifulSoup(html, "html.parser")
-
-        itemsData = extractItemsData(html)
+        tree = parseHtml(html)
 
-        productElements = soup.select(".goodsBlock .goods")
+        itemsData = extractItemsData(findScript(tree, ITEMS_RE))
 
-        for product in productElements:
-            productLink = product.select_one("a")
-            if not productLink or not productLink.get("href"):
+        for productImage in selectAll(tree, GOODS_IMAGE_SELECTOR):
+            product = findParent(productImage, GOODS_CLASS)
+            productKey = getNodeKey(product)
+            if productKey in seenProductElements:
                 continue
+            seenProductElements.add(productKey)
 
-            fullUrl = urljoin(BASE_URL, productLink.get("href"))
-
-            productId = extractProductId(product)
-            if not productId:
+            productId = (getAttribute(productImage, "id") or "")[1:]
+            if not productId or productId in seenProductIds:
+                continue
+            productLink = selectOne(product, LINK_SELECTOR)
+            productHref = getAttribute(productLink, "href") if productLink else None
+            if not productHref:
                 continue
 
-            if productId not in productsInfo:
-
-                productsInfo[productId] = {
-                    "url": fullUrl,
-                    "product_id": productId,
-                    "variants": []
-                }
+            fullUrl = urljoin(BASE_URL, productHref)
 
-            productsInfo[productId]["variants"] = extractProductVariants(itemsData, productId)
+            seenProductIds.add(productId)
+            productsInfo.append({
+                "url": fullUrl,
+                "product_id": productId,
+                **extractCatalogDetails(product),
+                "variants": extractProductVariants(itemsData, productId)
+            })
 
-        result = list(productsInfo.values())
-        logger.info(f"Найдено {len(result)} товаров на странице {page} категории")
-        return result
+        logger.info(f"Найдено {len(productsInfo)} товаров на странице {page} категории")
+        return productsInfo
 
     except Exception as e:
         logger.error(f"Ошибка при получении информации о товарах со страницы {page} категории {categoryUrl}: {e}")
@@ -195,22 +362,31 @@ def parseProduct(productInfo):
     url = productInfo.get("url", "")
     variants = productInfo.get("variants", [])
 
+    if productInfo.get("name") and productInfo.get("description") and productInfo.get("image"):
+        return {
+            "url": url,
+            "name": productInfo["name"],
+            "description": productInfo["description"],
+            "image": productInfo["image"],
+            "variants": variants
+        }
+
     try:
         logger.info(f"Парсинг товара: {url}")
         html = makeRequest(url)
         if not html:
             raise ValueError("Не удалось получить HTML страницы товара")
 
-        soup = BeautifulSoup(html, "html.parser")
+        tree = parseHtml(html)
 
-        nameElement = soup.select_one("h1")
-        name = nameElement.get_text(separator=" ", strip=True) if nameElement else None
+        nameElement = selectOne(tree, TITLE_SELECTOR)
+        name = getText(nameElement) if nameElement else None
 
-        descriptionElement = soup.select_one("[itemprop=description]")
-        description = descriptionElement.get_text(separator=" ", strip=True).replace("\xa0", " ") if descriptionElement else None
+        descriptionElement = selectOne(tree, DESCRIPTION_SELECTOR)
+        description = getText(descriptionElement).replace("\xa0", " ") if descriptionElement else None
 
-        imageElement = soup.select_one(".eslider-main-img")
-        image = urljoin(BASE_URL, imageElement.get("src").strip()) if imageElement else None
+        imageElement = selectOne(tree, MAIN_IMAGE_SELECTOR)
+        image = urljoin(BASE_URL, getAttribute(imageElement, "src").strip()) if imageElement else None
 
         return {
             "url": url,
@@ -230,6 +406,7 @@ def parseShop():
     logger.info("Начало работы парсера")
 
     result = []
+    checkpoint = loadCheckpoint()
 
     for categoryUrl in CATEGORIES:
         try:
@@ -242,22 +419,40 @@ def parseShop():
                 "goods": []
             }
 
-            for page in range(1, pagesCount + 1):
-                logger.info(f"Обработка страницы {page} из {pagesCount} для категории {categoryName}")
+            logger.info(f"Обработка {pagesCount} страниц для категории {categoryName}")
+
+            processedProducts = checkpoint["categories"].setdefault(categoryUrl, {})
 
-                productsInfo = getProductsInfoFromCatalog(categoryUrl, page)
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+                pagesProductsInfo = list(executor.map(
+                    lambda page: getProductsInfoFromCatalog(categoryUrl, page),
+                    range(1, pagesCount + 1)
+                ))
 
-                for productInfo in productsInfo:
-                    productData = parseProduct(productInfo)
-                    if productData:
-                        categoryData["goods"].append(productData)
+                for productsInfo in pagesProductsInfo:
+                    pendingProducts = [
+                        productInfo for productInfo in productsInfo
+                        if productInfo["product_id"] not in processedProducts
+                    ]
+
+                    for productInfo, productData in zip(pendingProducts, executor.map(parseProduct, pendingProducts)):
+                        if productData:
+                            processedProducts[productInfo["product_id"]] = productData
+
+                    for productInfo in productsInfo:
+                        productData = processedProducts.get(productInfo["product_id"])
+                        if productData:
+                            categoryData["goods"].append({**productData, "variants": productInfo["variants"]})
+
+                    saveCheckpoint(checkpoint)
 
             result.append(categoryData)
 
         except Exception as e:
             logger.error(f"Ошибка при обработке категории {categoryUrl}: {e}")
 
-    saveToJsonFile(result)
+    if saveToJsonFile(result):
+        removeCheckpoint()
     logger.info(f"Работа парсера завершена. Следующий парсинг начнётся автоматически через {EXECUTION_INTERVAL_DAYS} дней")
 
 
@@ -266,19 +461,63 @@ def saveToJsonFile(data):
     Сохраняет данные в JSON файл.
     """
     try:
-        with open("shop_data.json", "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        with open("shop_data.json", "wb") as f:
+            f.write(orjson.dumps(data))
         logger.info("Данные успешно сохранены в файл shop_data.json")
+        return True
     except Exception as e:
         logger.error(f"Ошибка при сохранении данных в JSON файл: {e}")
+        return False
 
-def runScheduler():
-    schedule.every(EXECUTION_INTERVAL_DAYS).days.do(parseShop)
 
-    while True:
-        schedule.run_pending()
-        time.sleep(3600)
+def loadCheckpoint():
+    """
+    Загружает уже обработанные товары прерванного запуска, чтобы не парсить их повторно.
+    Контрольная точка старше интервала запуска считается устаревшей и не используется.
+    """
+    newCheckpoint = {"created_at": time.time(), "categories": {}}
+
+    if not os.path.exists(CHECKPOINT_FILE):
+        return newCheckpoint
+
+    try:
+        with open(CHECKPOINT_FILE, "rb") as f:
+            checkpoint = orjson.loads(f.read())
+
+        if time.time() - checkpoint.get("created_at", 0) > EXECUTION_INTERVAL_DAYS * 86400:
+            logger.info(f"Контрольная точка {CHECKPOINT_FILE} устарела, парсинг начнётся заново")
+            return newCheckpoint
+
+        logger.info(f"Продолжение прерванного парсинга из файла {CHECKPOINT_FILE}")
+        return checkpoint
+    except Exception as e:
+        logger.error(f"Ошибка при загрузке контрольной точки: {e}")
+        return newCheckpoint
+
+
+def saveCheckpoint(checkpoint):
+    """
+    Сохраняет обработанные товары по категориям в файл контрольной точки.
+    """
+    try:
+        with open(CHECKPOINT_FILE, "wb") as f:
+            f.write(orjson.dumps(checkpoint))
+    except Exception as e:
+        logger.error(f"Ошибка при сохранении контрольной точки: {e}")
+
+
+def removeCheckpoint():
+    """
+    Удаляет файл контрольной точки после успешного завершения парсинга.
+    """
+    try:
+        if os.path.exists(CHECKPOINT_FILE):
+            os.remove(CHECKPOINT_FILE)
+    except Exception as e:
+        logger.error(f"Ошибка при удалении контрольной точки: {e}")
+
 
 if __name__ == "__main__":
-    parseShop()
-    runScheduler()
+    while True:
+        parseShop()
+        time.sleep(EXECUTION_INTERVAL_DAYS * 86400)